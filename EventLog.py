@@ -0,0 +1,137 @@
+import os
+import struct
+import time
+
+
+# Event types, stored as unsigned short in every record
+SPRINKLER_SETUP = 1
+VALVE_OPEN = 2
+VALVE_CLOSE = 3
+SCHEDULE_REGISTERED = 4
+SCHEDULES_READ = 5
+LOOP_STARTED = 6
+ERROR = 9
+SHUTDOWN = 10
+GPIO_CLEANUP = 11
+
+EVENT_NAMES = {
+    SPRINKLER_SETUP: 'sprinkler-setup',
+    VALVE_OPEN: 'valve-open',
+    VALVE_CLOSE: 'valve-close',
+    SCHEDULE_REGISTERED: 'schedule-registered',
+    SCHEDULES_READ: 'schedules-read',
+    LOOP_STARTED: 'loop-started',
+    ERROR: 'error',
+    SHUTDOWN: 'shutdown',
+    GPIO_CLEANUP: 'gpio-cleanup',
+}
+
+# Shutdown reasons (value a of SHUTDOWN)
+SHUTDOWN_KEYBOARD = 1
+SHUTDOWN_ERROR = 2
+
+# Error classes (value a of ERROR, value b is the line in the logging module, e.g. daemon.py, the error came through)
+ERROR_OTHER = 0
+ERROR_OS = 1
+ERROR_VALUE = 2
+ERROR_KEY = 3
+ERROR_RUNTIME = 4
+ERROR_TYPE = 5
+
+ERROR_NAMES = {
+    ERROR_OTHER: 'other',
+    ERROR_OS: 'os',
+    ERROR_VALUE: 'value',
+    ERROR_KEY: 'key',
+    ERROR_RUNTIME: 'runtime',
+    ERROR_TYPE: 'type',
+}
+
+# checked in order, subclasses (e.g. json.JSONDecodeError of ValueError) map to their base
+_ERROR_CLASSES = [
+    (OSError, ERROR_OS),
+    (ValueError, ERROR_VALUE),
+    (KeyError, ERROR_KEY),
+    (RuntimeError, ERROR_RUNTIME),
+    (TypeError, ERROR_TYPE),
+]
+
+# Fixed record: timestamp, event type, sprinkler id (-1 if none), three integer values
+RECORD = struct.Struct('<dHhiii')
+RECORD_SIZE = RECORD.size
+
+
+def errorCode(error):
+    for errorClass, code in _ERROR_CLASSES:
+        if isinstance(error, errorClass):
+            return code
+    return ERROR_OTHER
+
+
+# Line of the outermost frame, i.e. in the module catching the error rather than somewhere inside a library
+def errorLine(error):
+    if error.__traceback__ is None:
+        return 0
+    return error.__traceback__.tb_lineno
+
+
+def timeToMinutes(hhmm):
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class EventLog():
+
+    def __init__(self, path='garden-events.log', maxBytes=1024 * 1024, backupCount=3, bufferedRecords=64):
+        self.path = path
+        # keep whole records in each file
+        self.maxBytes = max(RECORD_SIZE, maxBytes - maxBytes % RECORD_SIZE)
+        self.backupCount = backupCount
+        self.bufferSize = bufferedRecords * RECORD_SIZE
+        self.buffer = bytearray(self.bufferSize)
+        self.used = 0
+        self.file = open(self.path, 'ab')
+        self.fileSize = self.file.tell()
+        if self.fileSize % RECORD_SIZE:
+            # drop a record cut short by a power loss, records appended behind it would be misaligned
+            self.fileSize -= self.fileSize % RECORD_SIZE
+            self.file.truncate(self.fileSize)
+
+    def write(self, eventType, sprinklerId=-1, a=0, b=0, c=0):
+        RECORD.pack_into(self.buffer, self.used, time.time(), eventType, sprinklerId, a, b, c)
+        self.used += RECORD_SIZE
+        if self.used == self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        if self.used == 0:
+            return
+        view = memoryview(self.buffer)
+        offset = 0
+        while offset < self.used:
+            if self.fileSize >= self.maxBytes:
+                self.rotate()
+            chunk = min(self.used - offset, self.maxBytes - self.fileSize)
+            self.file.write(view[offset:offset + chunk])
+            self.fileSize += chunk
+            offset += chunk
+        view.release()
+        self.file.flush()
+        self.used = 0
+
+    def rotate(self):
+        self.file.close()
+        if self.backupCount > 0:
+            for i in range(self.backupCount - 1, 0, -1):
+                source = '{}.{}'.format(self.path, i)
+                if os.path.exists(source):
+                    os.replace(source, '{}.{}'.format(self.path, i + 1))
+            os.replace(self.path, self.path + '.1')
+            self.file = open(self.path, 'ab')
+        else:
+            self.file = open(self.path, 'wb')
+        self.fileSize = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
@@ -0,0 +1,142 @@
+import datetime
+import time
+
+
+class IrrigationPlan():
+
+    days = 7
+
+    def __init__(self, config, anchor=None):
+        self.sprinklers = {sprinkler['id']: sprinkler['name'] for sprinkler in config['sprinklers']}
+        self.schedules = [dict(toBeScheduled) for toBeScheduled in config['schedules']]
+        weather = config.get('weather', {})
+        self.skipRainMm = weather.get('skipRainMm', 5.0)
+        # time daemon.py registered the schedules, the schedule library counts recurrences from here. Without it
+        # the plan is only correct for daily schedules
+        self.anchor = anchor if anchor is not None else datetime.datetime.now()
+        self.today = None
+        self.forecast = {}      # date -> (rain, condition), including days beyond the window
+        self.runs = {}          # sprinklerId -> {date: [run, ...]}
+        self.lastUpdate = None
+
+    # Mirrors schedule.every(n).days.at(t): with n == 1 the first run is today if t is still ahead,
+    # otherwise the first run is n days after registration
+    def _firstRun(self, toBeScheduled):
+        start = datetime.datetime.strptime(toBeScheduled['startTime'], '%H:%M').time()
+        recurrence = toBeScheduled['recurrenceInDays']
+        if recurrence == 1 and start > self.anchor.time():
+            return self.anchor.date()
+        return self.anchor.date() + datetime.timedelta(days=recurrence)
+
+    def _runsOn(self, toBeScheduled, day):
+        first = self._firstRun(toBeScheduled)
+        return day >= first and (day - first).days % toBeScheduled['recurrenceInDays'] == 0
+
+    def _window(self):
+        return [self.today + datetime.timedelta(days=d) for d in range(IrrigationPlan.days)]
+
+    def _zones(self):
+        return set(self.sprinklers) | {toBeScheduled['sprinklerId'] for toBeScheduled in self.schedules}
+
+    def _computeDay(self, sprinklerId, day):
+        rain, condition = self.forecast.get(day, (None, None))
+        runs = []
+        for toBeScheduled in self.schedules:
+            if toBeScheduled['sprinklerId'] != sprinklerId or not self._runsOn(toBeScheduled, day):
+                continue
+            skip = rain is not None and rain >= self.skipRainMm
+            runs.append({
+                'sprinklerId': sprinklerId,
+                'name': self.sprinklers.get(sprinklerId),
+                'date': day,
+                'startTime': toBeScheduled['startTime'],
+                'endTime': toBeScheduled['endTime'],
+                'rain': rain,
+                'condition': condition,
+                'skip': skip
+            })
+        runs.sort(key=lambda run: run['startTime'])
+        return runs
+
+    def _recompute(self, kind, cells, started):
+        zones = set()
+        days = set()
+        for sprinklerId, day in cells:
+            runs = self._computeDay(sprinklerId, day)
+            if runs:
+                self.runs.setdefault(sprinklerId, {})[day] = runs
+            elif day in self.runs.get(sprinklerId, {}):
+                del self.runs[sprinklerId][day]
+            zones.add(sprinklerId)
+            days.add(day)
+        self.lastUpdate = {
+            'kind': kind,
+            'seconds': time.perf_counter() - started,
+            'zones': len(zones),
+            'days': len(days)
+        }
+        return self.lastUpdate
+
+    def build(self, today=None):
+        started = time.perf_counter()
+        self.today = today if today is not None else datetime.date.today()
+        self.runs = {}
+        return self._recompute('build', [(z, d) for z in self._zones() for d in self._window()], started)
+
+    # Moves the seven-day window forward, only days that newly enter the window are computed
+    def advance(self, today=None):
+        started = time.perf_counter()
+        today = today if today is not None else datetime.date.today()
+        if self.today is None or today < self.today:
+            return self.build(today)
+        lastDay = self._window()[-1]
+        self.today = today
+        for days in self.runs.values():
+            for day in [d for d in days if d < today]:
+                del days[day]
+        for day in [d for d in self.forecast if d < today]:
+            del self.forecast[day]
+        newDays = [d for d in self._window() if d > lastDay]
+        return self._recompute('advance', [(z, d) for z in self._zones() for d in newDays], started)
+
+    # Takes the forecast list of OpenWeatherMapIntegration, only zones watering on a day whose
+    # forecast changed are recomputed
+    def updateForecast(self, forecast):
+        if self.today is None:
+            self.build()
+        started = time.perf_counter()
+        updated = {}
+        for entry in forecast:
+            updated[entry['time'].date()] = (entry.get('rain', 0), entry.get('id'))
+        changed = [d for d in self._window() if self.forecast.get(d) != updated.get(d)]
+        self.forecast = updated
+        cells = []
+        for day in changed:
+            for sprinklerId in self._zones():
+                if day in self.runs.get(sprinklerId, {}):
+                    cells.append((sprinklerId, day))
+        return self._recompute('forecast', cells, started)
+
+    # Replaces the schedule at index (None appends, a schedule of None removes it), only the zones
+    # of the old and the new schedule are recomputed
+    def updateSchedule(self, index, toBeScheduled):
+        if self.today is None:
+            self.build()
+        started = time.perf_counter()
+        zones = set()
+        if index is not None:
+            zones.add(self.schedules[index]['sprinklerId'])
+        if toBeScheduled is not None:
+            zones.add(toBeScheduled['sprinklerId'])
+            if index is None:
+                self.schedules.append(dict(toBeScheduled))
+            else:
+                self.schedules[index] = dict(toBeScheduled)
+        elif index is not None:
+            del self.schedules[index]
+        return self._recompute('schedule', [(z, d) for z in zones for d in self._window()], started)
+
+    def plan(self):
+        runs = [run for days in self.runs.values() for dayRuns in days.values() for run in dayRuns]
+        runs.sort(key=lambda run: (run['date'], run['startTime'], run['sprinklerId']))
+        return runs
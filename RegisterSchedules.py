@@ -1,17 +1,19 @@
 import schedule
+import EventLog
 
 
 class RegisterSchedules():
 
     @staticmethod
-    def registerSchedules(schedules):
+    def registerSchedules(schedules, eventLog):
         for toBeScheduled in schedules:
-            RegisterSchedules.registerSchedule(toBeScheduled)
+            RegisterSchedules.registerSchedule(toBeScheduled, eventLog)
 
     @staticmethod
-    def registerSchedule(toBeScheduled):
+    def registerSchedule(toBeScheduled, eventLog):
         schedule.every( toBeScheduled.recurrenceInDays).days.at(toBeScheduled.startTime).do(toBeScheduled.sprinkler.startSprinkler)
         schedule.every( toBeScheduled.recurrenceInDays).days.at(toBeScheduled.endTime).do(toBeScheduled.sprinkler.stopSprinkler)
 
-        print( 'Schedule registered', toBeScheduled.sprinkler.name, toBeScheduled.startTime, '-', toBeScheduled.endTime, 'P', toBeScheduled.recurrenceInDays ,'D')
-
+        eventLog.write(EventLog.SCHEDULE_REGISTERED, toBeScheduled.sprinkler.id,
+                       EventLog.timeToMinutes(toBeScheduled.startTime), EventLog.timeToMinutes(toBeScheduled.endTime),
+                       toBeScheduled.recurrenceInDays)
@@ -1,20 +1,24 @@
 import RPi.GPIO as GPIO
+import EventLog
 
 
 class Sprinkler():
-    def __init__(self, id, name, gpio):
+    def __init__(self, id, name, gpio, eventLog):
         GPIO.setmode(GPIO.BCM)
         self.id = id
         self.name = name
         self.gpio = gpio
+        self.eventLog = eventLog
         GPIO.setup(gpio, GPIO.OUT)
-        print(self.id, self.gpio, self.name)
+        self.eventLog.write(EventLog.SPRINKLER_SETUP, self.id, self.gpio)
         self.stopSprinkler()
 
     def startSprinkler(self):
         GPIO.output(self.gpio, GPIO.LOW)
-        print(self.id, self.gpio, self.name, ' ', 'start')
+        self.eventLog.write(EventLog.VALVE_OPEN, self.id, self.gpio)
+        self.eventLog.flush()
 
     def stopSprinkler(self):
         GPIO.output(self.gpio, GPIO.HIGH)
-        print(self.id, self.gpio, self.name, ' ', 'stop')
+        self.eventLog.write(EventLog.VALVE_CLOSE, self.id, self.gpio)
+        self.eventLog.flush()
@@ -3,11 +3,13 @@ import time
 import sys
 import schedule
 
-from datetime import datetime
+import EventLog
 from ScheduleConfig import *
 from Sprinkler import *
 from RegisterSchedules import *
 
+eventLog = EventLog.EventLog('garden-events.log')
+
 try:
 
     with open('garden-config.json') as json_data:
@@ -15,26 +17,34 @@ try:
 
     sprinklerList = []
     for sprinkler in config['sprinklers']:
-        sprinklerList.append(Sprinkler(sprinkler['id'], sprinkler['name'], sprinkler['gpio']))
-    print('Sprinklers read')
+        sprinklerList.append(Sprinkler(sprinkler['id'], sprinkler['name'], sprinkler['gpio'], eventLog))
 
     schedules = []
     for toBeScheduled in config['schedules']:
         sprinkler = next((x for x in sprinklerList if x.id == toBeScheduled['sprinklerId']), None)
         schedules.append(ScheduleConfig(sprinkler, toBeScheduled['startTime'], toBeScheduled['endTime'], toBeScheduled['recurrenceInDays']))
-    RegisterSchedules.registerSchedules(schedules)
-    print('Schedules read')
+    RegisterSchedules.registerSchedules(schedules, eventLog)
+    eventLog.write(EventLog.SCHEDULES_READ, -1, len(schedules))
 
-    print('now looping to run pending schedules ...')
+    eventLog.write(EventLog.LOOP_STARTED)
+    eventLog.flush()
     while (True):
-        print(datetime.now().strftime('%Y-%m-%dT%H:%M:%S'))
         schedule.run_pending()
         time.sleep(1)
 
 except KeyboardInterrupt:
-    print(' exit by keyboard interrupt')
+    eventLog.write(EventLog.SHUTDOWN, -1, EventLog.SHUTDOWN_KEYBOARD)
     sys.exit()
 
+except Exception as error:
+    eventLog.write(EventLog.ERROR, -1, EventLog.errorCode(error), EventLog.errorLine(error))
+    eventLog.write(EventLog.SHUTDOWN, -1, EventLog.SHUTDOWN_ERROR)
+    raise
+
 finally:
-    GPIO.cleanup()
-    print('GPIO channels cleaned up')
+    eventLog.flush()
+    try:
+        GPIO.cleanup()
+        eventLog.write(EventLog.GPIO_CLEANUP)
+    finally:
+        eventLog.close()
@@ -0,0 +1,125 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from integration import NetatmoIntegration, OpenWeatherMapIntegration, WetterComIntegration
+from profiling import Profiler
+
+# Replays recorded provider responses through the integration parsers, offline.
+#
+#   python benchmark.py                              report throughput and allocations per phase
+#   python benchmark.py --save baseline.json         record a baseline
+#   python benchmark.py --baseline baseline.json     exit 1 if a phase got slower or allocates more than allowed
+
+_payloads = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads')
+
+# The recorded wetter.com forecast covers this day
+_wettercom_now = datetime.datetime(2018, 10, 19, 12, 0)
+
+_parsers = [
+    ('netatmo', 'netatmo.json', NetatmoIntegration.parse),
+    ('owm', 'owm.json', OpenWeatherMapIntegration.parse),
+    ('wettercom', 'wettercom.json', lambda data: WetterComIntegration.parse(data, _wettercom_now)),
+]
+
+
+def replay(profiler, raw, iterations):
+    for name, _, parse in _parsers:
+        for i in range(iterations):
+            # Results are kept alive until the phase ended, so allocations count the blocks of what a phase
+            # produces, and released outside of the phases, so freeing them is not counted against the next one
+            with profiler.phase(name + '.decode'):
+                data = json.loads(raw[name])
+            with profiler.phase(name + '.parse'):
+                result = parse(data)
+            data = result = None
+
+
+def run(iterations, allocation_iterations):
+    raw = {}
+    for name, filename, _ in _parsers:
+        with open(os.path.join(_payloads, filename), 'rb') as payload:
+            raw[name] = payload.read()
+
+    # Timing and allocation tracing are separate passes, tracemalloc slows down the measured code considerably
+    timing = Profiler()
+    timing.enable(trace_allocations=False)
+    replay(timing, raw, iterations)
+    timing.disable()
+
+    allocations = Profiler()
+    allocations.enable(trace_allocations=True)
+    replay(allocations, raw, allocation_iterations)
+    allocations.disable()
+
+    result = {}
+    allocation_summary = allocations.summary()
+    for name, entry in timing.summary().items():
+        result[name] = {
+            'per_second': entry['per_second'],
+            'mean_us': entry['mean_seconds'] * 1e6,
+            'peak_bytes': allocation_summary[name]['peak_bytes'],
+            'allocations_per_call': allocation_summary[name]['allocations_per_call']
+        }
+    return result
+
+
+def compare(result, baseline, tolerance):
+    failures = []
+    for name, expected in baseline.items():
+        if name not in result:
+            failures.append('{}: phase missing'.format(name))
+            continue
+        actual = result[name]
+        if actual['per_second'] < expected['per_second'] / tolerance:
+            failures.append('{}: {:.0f} calls/s, baseline {:.0f}'.format(
+                name, actual['per_second'], expected['per_second']))
+        if actual['peak_bytes'] > expected['peak_bytes'] * tolerance:
+            failures.append('{}: peak {} bytes, baseline {}'.format(
+                name, actual['peak_bytes'], expected['peak_bytes']))
+        # allow at least one more block, so a baseline of zero allocations does not fail on any allocation
+        if actual['allocations_per_call'] > max(expected['allocations_per_call'] * tolerance,
+                                                expected['allocations_per_call'] + 1):
+            failures.append('{}: {:.1f} allocations per call, baseline {:.1f}'.format(
+                name, actual['allocations_per_call'], expected['allocations_per_call']))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded payloads through the integration parsers')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--allocation-iterations', type=int, default=50)
+    parser.add_argument('--json', action='store_true', help='print the result as json')
+    parser.add_argument('--save', help='write the result to this baseline file')
+    parser.add_argument('--baseline', help='compare against this baseline file')
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help='allowed factor of slowdown or allocation growth against the baseline')
+    args = parser.parse_args()
+
+    result = run(args.iterations, args.allocation_iterations)
+
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    else:
+        print('{:<20} {:>12} {:>10} {:>12} {:>12}'.format('phase', 'calls/s', 'mean us', 'peak bytes', 'allocs/call'))
+        for name, entry in result.items():
+            print('{:<20} {:>12.0f} {:>10.1f} {:>12} {:>12.1f}'.format(
+                name, entry['per_second'], entry['mean_us'], entry['peak_bytes'], entry['allocations_per_call']))
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump(result, baseline_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            failures = compare(result, json.load(baseline_file), args.tolerance)
+        for failure in failures:
+            print('REGRESSION ' + failure, file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import importlib
+import sys
+import types
+
+# integration.py imports kivy, requests and astral at module level. The parsers and weather id mappings under test
+# need none of them, so lightweight stand-ins are installed for whichever is not available.
+
+
+def _missing(name):
+    try:
+        importlib.import_module(name)
+        return False
+    except ImportError:
+        return True
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def _ignore(*args, **kwargs):
+    pass
+
+
+if _missing('kivy.clock') or _missing('kivy.logger'):
+    kivy = _module('kivy')
+    kivy.clock = _module('kivy.clock', Clock=types.SimpleNamespace(schedule_interval=_ignore, schedule_once=_ignore))
+    kivy.logger = _module('kivy.logger', Logger=types.SimpleNamespace(
+        debug=_ignore, info=_ignore, warning=_ignore, exception=_ignore))
+
+if _missing('requests'):
+    class RequestException(IOError):
+        pass
+
+    requests = _module('requests', get=_ignore, post=_ignore)
+    requests.exceptions = _module('requests.exceptions', RequestException=RequestException,
+                                  __all__=['RequestException'])
+
+if _missing('astral'):
+    _module('astral', Location=types.SimpleNamespace)
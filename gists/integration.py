@@ -6,11 +6,12 @@ import astral
 import datetime
 import hashlib
 
-from enum import Enum, unique
-
 from kivy.clock import Clock
 from kivy.logger import Logger
 
+from profiling import profiler
+from weather import WeatherCondition
+
 # Using I2C on RasPi for reading a light sensor
 import platform
 if 'arm' in platform.uname().machine:
@@ -21,22 +22,6 @@ class ParsingException(Exception):
     pass
 
 
-@unique
-class WeatherCondition(Enum):
-    clear = 1
-    cloudy = 2
-    drizzle = 3
-    rain = 4
-    heavy_rain = 5
-    hail = 6
-    snow = 7
-    heavy_snow = 8
-    fog = 9
-    wind = 10
-    thunderstorm = 11
-    tornado = 12
-
-
 # TODO: load credentials from external file?
 class IntegrationBase:
 
@@ -161,101 +146,128 @@ class NetatmoIntegration(IntegrationBase):
             params = {
                 "access_token": self.access_token
             }
-            
-            
-            response = requests.post(NetatmoIntegration._baseUrl + "api/getstationsdata", data=params)
-            
-            
+            with profiler.phase('netatmo.fetch'):
+                response = requests.post(NetatmoIntegration._baseUrl + "api/getstationsdata", data=params)
             #print(json.dumps(response.json(), sort_keys=True, indent=4, separators=(',', ': ')))
         except RequestException as rex:
             Logger.debug('Netatmo: Failed to refresh data')
             Logger.exception(str(rex))
-            Logger.debug(str(response.content))
             return
 
         # Parse Response
         try:
-
-            # TODO identify errors like
-            # {
-            #     "error": {
-            #         "code": 500,
-            #         "message": "Internal Server Error"
-            #     }
-            # }
-
-            # This is the station's locale string for displaying values
-            self.locale = response.json()['body']['user']['administrative']['reg_locale'].replace('-', '_')
-            station = response.json()['body']['devices'][0]
-            self.name = station['station_name']
-            self.wifiStatus = station['wifi_status']
-            self.calibratingCo2 = station['co2_calibrating']
-            self.position.name = self.name
-            self.position.region = station['place']['city']
-            self.position.latitude = station['place']['location'][1]
-            self.position.longitude = station['place']['location'][0]
-            self.position.timezone = station['place']['timezone']
-            self.position.elevation = 0
+            with profiler.phase('netatmo.decode'):
+                payload = response.json()
+            with profiler.phase('netatmo.parse'):
+                data = NetatmoIntegration.parse(payload)
+            with profiler.phase('netatmo.apply'):
+                self.apply(data)
             Logger.debug("Netatmo: Location is {} ({}, {}); timezone: {}".format(
                 str(self.position.region), str(self.position.latitude), str(self.position.longitude),
                 str(self.position.timezone)))
+            Logger.debug('Netatmo: Data refresh successful')
 
-            # Inside module
-            data = station['dashboard_data']
-            self.inside['temperature'] = {
+        except (KeyError, ValueError) as err:
+            Logger.debug('Netatmo: Failed to parse json')
+            Logger.exception(str(err))
+            Logger.debug(str(response.content))
+
+    # Extracts the station values from a getstationsdata response, raises KeyError or ValueError
+    @staticmethod
+    def parse(payload):
+
+        # TODO identify errors like
+        # {
+        #     "error": {
+        #         "code": 500,
+        #         "message": "Internal Server Error"
+        #     }
+        # }
+
+        station = payload['body']['devices'][0]
+        result = {
+            # This is the station's locale string for displaying values
+            'locale': payload['body']['user']['administrative']['reg_locale'].replace('-', '_'),
+            'name': station['station_name'],
+            'wifiStatus': station['wifi_status'],
+            'calibratingCo2': station['co2_calibrating'],
+            'region': station['place']['city'],
+            'latitude': station['place']['location'][1],
+            'longitude': station['place']['location'][0],
+            'timezone': station['place']['timezone']
+        }
+
+        # Inside module
+        data = station['dashboard_data']
+        result['inside'] = {
+            'temperature': {
                 'current': data['Temperature'],
                 'min': data['min_temp'],
                 'max': data['max_temp'],
                 'trend': data['temp_trend'] if 'temp_trend' in data else 0
-            }
-            self.inside['co2'] = data['CO2']
-            self.inside['humidity'] = data['Humidity']
-            self.inside['pressure'] = {
+            },
+            'co2': data['CO2'],
+            'humidity': data['Humidity'],
+            'pressure': {
                 'current': data['Pressure'],
                 'trend': data['pressure_trend']
-            }
-            self.inside['noise'] = data['Noise']
+            },
+            'noise': data['Noise']
+        }
 
-            # TODO: find a better way of identifying the modules (sequence depends on configuration)
+        # TODO: find a better way of identifying the modules (sequence depends on configuration)
 
-            # outside module
-            data = station['modules'][1]
-            self.outside['battery'] = data['battery_percent']
-            self.outside['connection'] = data['rf_status']
-            data = station['modules'][1]['dashboard_data']
-            self.outside['temperature'] = {
+        # outside module
+        data = station['modules'][1]['dashboard_data']
+        result['outside'] = {
+            'battery': station['modules'][1]['battery_percent'],
+            'connection': station['modules'][1]['rf_status'],
+            'temperature': {
                 'current': data['Temperature'],
                 'min': data['min_temp'],
                 'max': data['max_temp'],
                 'trend': data['temp_trend'] if 'temp_trend' in data else 0
-            }
-            self.outside['humidity'] = data['Humidity']
-
-            # rain module
-            data = station['modules'][0]
-            self.rain['battery'] = data['battery_percent']
-            self.rain['connection'] = data['rf_status']
-            data = station['modules'][0]['dashboard_data']
-            self.rain['rain'] = {
+            },
+            'humidity': data['Humidity']
+        }
+
+        # rain module
+        data = station['modules'][0]['dashboard_data']
+        result['rain'] = {
+            'battery': station['modules'][0]['battery_percent'],
+            'connection': station['modules'][0]['rf_status'],
+            'rain': {
                 'hour': data['sum_rain_1'],
                 'day': data['sum_rain_24'] if 'sum_rain_24' in data else 0
             }
+        }
 
-            # alarms
-            if 'meteo_alarms' in station:
-                for alarm in station['meteo_alarms']:
-                    self.alarm.append({
-                        'type': alarm['type'],
-                        'level': alarm['level'],
-                        'description': alarm['descr'][13:]
-                    })
-
-            Logger.debug('Netatmo: Data refresh successful')
-
-        except (KeyError, ValueError) as err:
-            Logger.debug('Netatmo: Failed to parse json')
-            Logger.exception(str(err))
-            Logger.debug(str(response.content))
+        # alarms
+        result['alarm'] = []
+        if 'meteo_alarms' in station:
+            for alarm in station['meteo_alarms']:
+                result['alarm'].append({
+                    'type': alarm['type'],
+                    'level': alarm['level'],
+                    'description': alarm['descr'][13:]
+                })
+        return result
+
+    def apply(self, data):
+        self.locale = data['locale']
+        self.name = data['name']
+        self.wifiStatus = data['wifiStatus']
+        self.calibratingCo2 = data['calibratingCo2']
+        self.position.name = self.name
+        self.position.region = data['region']
+        self.position.latitude = data['latitude']
+        self.position.longitude = data['longitude']
+        self.position.timezone = data['timezone']
+        self.position.elevation = 0
+        self.inside.update(data['inside'])
+        self.outside.update(data['outside'])
+        self.rain.update(data['rain'])
+        self.alarm.extend(data['alarm'])
 
 
 class OpenWeatherMapIntegration(IntegrationBase):
@@ -270,7 +282,8 @@ class OpenWeatherMapIntegration(IntegrationBase):
         self.forecast = []
 
     # Converts OWM weather id to common weather condition
-    def _convert_weather_id(self, weather_id):
+    @staticmethod
+    def _convert_weather_id(weather_id):
         if 200 <= weather_id <= 299:
             return WeatherCondition.thunderstorm
         if 300 <= weather_id <= 399:
@@ -321,7 +334,8 @@ class OpenWeatherMapIntegration(IntegrationBase):
                 "lang": "de",
                 "cnt": 10
             }
-            response = requests.get(OpenWeatherMapIntegration._baseUrl + "forecast/daily", params=params);
+            with profiler.phase('owm.fetch'):
+                response = requests.get(OpenWeatherMapIntegration._baseUrl + "forecast/daily", params=params);
             # print(json.dumps(response.json(), indent=2))
         except RequestException as rex:
             Logger.debug('OWM: Failed to refresh data')
@@ -330,29 +344,41 @@ class OpenWeatherMapIntegration(IntegrationBase):
 
         # Parse response
         try:
-            for entry in response.json()['list']:
-                timestamp = datetime.datetime.fromtimestamp(entry['dt'])
-                self.forecast.append({
-                    'time': timestamp,
-                    'description': entry['weather'][0]['description'],
-                    'icon': entry['weather'][0]['icon'],
-                    'id': self._convert_weather_id(entry['weather'][0]['id']),
-                    'temperature': {
-                        "min": float(format(entry['temp']['min'], '.1f')),
-                        "max": float(format(entry['temp']['max'], '.1f')),
-                    },
-                    'pressure': entry['pressure'],
-                    'humidity': entry['humidity'],
-                    'clouds': entry['clouds'] if 'clouds' in entry else 0,
-                    'snow': entry['snow'] if 'snow' in entry else 0,
-                    'rain': entry['rain'] if 'rain' in entry else 0
-                })
+            with profiler.phase('owm.decode'):
+                payload = response.json()
+            with profiler.phase('owm.parse'):
+                forecast = OpenWeatherMapIntegration.parse(payload)
+            with profiler.phase('owm.apply'):
+                self.forecast.extend(forecast)
         except KeyError as kerr:
             Logger.debug('OWM: Failed to parse json')
             Logger.exception(str(kerr))
             Logger.debug(str(response.content))
         Logger.debug('OWM: Data refresh successful')
 
+    # Converts a daily forecast response to a list of forecast entries, raises KeyError
+    @staticmethod
+    def parse(payload):
+        forecast = []
+        for entry in payload['list']:
+            timestamp = datetime.datetime.fromtimestamp(entry['dt'])
+            forecast.append({
+                'time': timestamp,
+                'description': entry['weather'][0]['description'],
+                'icon': entry['weather'][0]['icon'],
+                'id': OpenWeatherMapIntegration._convert_weather_id(entry['weather'][0]['id']),
+                'temperature': {
+                    "min": float(format(entry['temp']['min'], '.1f')),
+                    "max": float(format(entry['temp']['max'], '.1f')),
+                },
+                'pressure': entry['pressure'],
+                'humidity': entry['humidity'],
+                'clouds': entry['clouds'] if 'clouds' in entry else 0,
+                'snow': entry['snow'] if 'snow' in entry else 0,
+                'rain': entry['rain'] if 'rain' in entry else 0
+            })
+        return forecast
+
 
 # Only gives min/max temperature for today and next two days
 class WetterComIntegration(IntegrationBase):
@@ -369,7 +395,8 @@ class WetterComIntegration(IntegrationBase):
         self._api_key = api_key
 
     # Converts Wetter.com id to common weather condition
-    def _convert_weather_id(self, weather_id):
+    @staticmethod
+    def _convert_weather_id(weather_id):
         if weather_id == 0:
             return WeatherCondition.clear
         if weather_id in (1, 2, 3) or 10 <= weather_id <= 39:
@@ -403,10 +430,11 @@ class WetterComIntegration(IntegrationBase):
             }
             checksum = hashlib.md5(self._project_name.encode('utf-8') + self._api_key.encode('utf-8') +
                                    self._city_code.encode('utf-8')).hexdigest()
-            response = requests.get(WetterComIntegration._baseUrl.format(self._city_code, self._project_name, checksum),
-                                    params=params);
+            with profiler.phase('wettercom.fetch'):
+                response = requests.get(
+                    WetterComIntegration._baseUrl.format(self._city_code, self._project_name, checksum),
+                    params=params);
             # print(json.dumps(response.json(), sort_keys=True, indent=4, separators=(',', ': ')))
-            data = response.json()
         except RequestException and ValueError and ConnectionError as ex:
             Logger.debug('Wetter.com: Failed to refresh data')
             Logger.exception(str(ex))
@@ -420,23 +448,14 @@ class WetterComIntegration(IntegrationBase):
         # Parse response
         try:
             now = datetime.datetime.now()
-            for daystring, forecast in data['city']['forecast'].items():
-                day = datetime.datetime.strptime(daystring, '%Y-%m-%d')
-                if day.date() == now.date():
-                    self.minimumTemperature = float(forecast['tn'])
-                    self.maximumTemperature = float(forecast['tx'])
-                    # TODO: take values from last day for range 00:00 .. 05:59
-                    if 6 <= now.hour <= 10:
-                        weather_id = forecast['06:00']['w']
-                    elif 11 <= now.hour <= 16:
-                        weather_id = forecast['11:00']['w']
-                    elif 17 <= now.hour <= 22:
-                        weather_id = forecast['17:00']['w']
-                    else:
-                        weather_id = forecast['23:00']['w']
-                    self.id = self._convert_weather_id(int(weather_id))
-                    break
-            else:
+            with profiler.phase('wettercom.decode'):
+                data = response.json()
+            with profiler.phase('wettercom.parse'):
+                today = WetterComIntegration.parse(data, now)
+            with profiler.phase('wettercom.apply'):
+                if today is not None:
+                    self.minimumTemperature, self.maximumTemperature, self.id = today
+            if today is None:
                 Logger.warning('Wetter.com: Unable to find date {} in forecast'.format(now.strftime('%Y-%m-%d')))
         except KeyError and AttributeError as err:
             Logger.warning('Wetter.com: Unable to parse json')
@@ -447,6 +466,26 @@ class WetterComIntegration(IntegrationBase):
         Logger.debug('Wetter.com: Data refresh successful')
         Logger.debug('Wetter.com: Got id {}'.format(self.id))
 
+    # Returns (minimum temperature, maximum temperature, weather condition) for the day of now, or None if the
+    # forecast does not contain that day
+    @staticmethod
+    def parse(data, now):
+        for daystring, forecast in data['city']['forecast'].items():
+            day = datetime.datetime.strptime(daystring, '%Y-%m-%d')
+            if day.date() == now.date():
+                # TODO: take values from last day for range 00:00 .. 05:59
+                if 6 <= now.hour <= 10:
+                    weather_id = forecast['06:00']['w']
+                elif 11 <= now.hour <= 16:
+                    weather_id = forecast['11:00']['w']
+                elif 17 <= now.hour <= 22:
+                    weather_id = forecast['17:00']['w']
+                else:
+                    weather_id = forecast['23:00']['w']
+                return (float(forecast['tn']), float(forecast['tx']),
+                        WetterComIntegration._convert_weather_id(int(weather_id)))
+        return None
+
 
 # This is the new, improved version for brightness control, using a TSL2561 via I2C
 class TSL2516BrightnessRegulation(IntegrationBase):
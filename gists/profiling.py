@@ -0,0 +1,107 @@
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+
+
+# Opt-in timers and allocation counters for named phases (e.g. 'netatmo.fetch', 'station.inside').
+# Disabled by default, a disabled phase records nothing. Allocation tracing is a separate opt-in, as tracemalloc
+# slows down everything running while it is active.
+#
+# With allocation tracing, each phase records:
+#   allocations  blocks allocated during the phase and still alive at its end (tracemalloc snapshot count_diff,
+#                summed over source lines that gained blocks), so memory freed by the garbage collector in between
+#                does not count against a phase
+#   net_bytes    traced memory at the end minus at the start of the phase
+#   peak_bytes   highest traced memory during the phase above its start; needs Python 3.9 (tracemalloc.reset_peak),
+#                stays 0 on older interpreters
+# Phases must not be nested, as snapshots and the allocation peak are taken per phase.
+class Profiler:
+
+    _filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_allocations = False
+        self.started_tracing = False
+        self.stats = {}
+
+    def enable(self, trace_allocations=False):
+        self.enabled = True
+        self.trace_allocations = trace_allocations
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def disable(self):
+        self.enabled = False
+        # leave tracing running if it was started elsewhere, e.g. with PYTHONTRACEMALLOC
+        if self.started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.started_tracing = False
+        self.trace_allocations = False
+
+    def reset(self):
+        self.stats = {}
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        trace = self.trace_allocations
+        if trace:
+            snapshot_start = tracemalloc.take_snapshot().filter_traces(Profiler._filters)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.stats.get(name)
+            if entry is None:
+                entry = self.stats[name] = {
+                    'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                    'allocations': 0, 'net_bytes': 0, 'peak_bytes': 0
+                }
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            entry['max_seconds'] = max(entry['max_seconds'], elapsed)
+            if trace:
+                memory_end, memory_peak = tracemalloc.get_traced_memory()
+                snapshot_end = tracemalloc.take_snapshot().filter_traces(Profiler._filters)
+                entry['allocations'] += sum(stat.count_diff for stat in snapshot_end.compare_to(snapshot_start, 'lineno')
+                                            if stat.count_diff > 0)
+                entry['net_bytes'] += memory_end - memory_start
+                if hasattr(tracemalloc, 'reset_peak'):
+                    entry['peak_bytes'] = max(entry['peak_bytes'], memory_peak - memory_start)
+
+    # Per phase: calls, total/mean/max seconds, calls per second, allocations (total and per call), net and peak bytes
+    def summary(self, prefix=''):
+        result = {}
+        for name, entry in sorted(self.stats.items()):
+            if not name.startswith(prefix):
+                continue
+            calls = entry['calls']
+            result[name] = dict(entry,
+                                mean_seconds=entry['seconds'] / calls,
+                                per_second=calls / entry['seconds'] if entry['seconds'] > 0 else float('inf'),
+                                allocations_per_call=entry['allocations'] / calls)
+        return result
+
+    def report(self, prefix=''):
+        lines = ['{:<24} {:>8} {:>12} {:>12} {:>12} {:>12} {:>12}'.format(
+            'phase', 'calls', 'mean ms', 'max ms', 'calls/s', 'allocs/call', 'peak bytes')]
+        for name, entry in self.summary(prefix).items():
+            lines.append('{:<24} {:>8} {:>12.3f} {:>12.3f} {:>12.1f} {:>12.1f} {:>12}'.format(
+                name, entry['calls'], entry['mean_seconds'] * 1000, entry['max_seconds'] * 1000,
+                entry['per_second'], entry['allocations_per_call'], entry['peak_bytes']))
+        return '\n'.join(lines)
+
+
+profiler = Profiler()
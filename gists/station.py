@@ -6,6 +6,7 @@ import json
 import platform
 
 from integration import  NetatmoIntegration
+from profiling import profiler
 
 class Station(App):
 
@@ -19,6 +20,11 @@ class Station(App):
         with open('config.json') as config_file:
             config = json.load(config_file)
 
+        # Profiling of integration refreshes and widget refreshes, opt-in. Allocation tracing is a separate
+        # option, as tracemalloc slows down the whole app while active
+        if config.get('profiling', False):
+            profiler.enable(trace_allocations=config.get('profiling_allocations', False))
+
         # Netatmo
         self.netatmo = NetatmoIntegration(
             config['netatmo']['client_id'],
@@ -46,47 +52,54 @@ class Station(App):
             locale.setlocale(locale.LC_ALL, self.netatmo.locale)
             station_time = timezone(self.netatmo.position.timezone)
             now = datetime.datetime.now(tz=station_time)
-            self.root.ids.time.refresh(now)
+            with profiler.phase('station.time'):
+                self.root.ids.time.refresh(now)
 
             # Inside data
             w = self.root.ids.inside
-            w.refresh(self.netatmo.inside['temperature']['current'], self.netatmo.inside['humidity'],
-                      self.netatmo.inside['co2'])
+            with profiler.phase('station.inside'):
+                w.refresh(self.netatmo.inside['temperature']['current'], self.netatmo.inside['humidity'],
+                          self.netatmo.inside['co2'])
 
             # Outside data
             w = self.root.ids.outside
             today = get_forecast_for_day(now)
 
-            w.refresh(self.netatmo.position, now, self.wetter.id, today['clouds'], today['rain'],
-                      self.netatmo.rain['rain']['day'])
+            with profiler.phase('station.outside'):
+                w.refresh(self.netatmo.position, now, self.wetter.id, today['clouds'], today['rain'],
+                          self.netatmo.rain['rain']['day'])
 
             # Outside temperature
             w = self.root.ids.outside_temperature
-            w.refresh(self.netatmo.outside['temperature']['current'], self.netatmo.outside['temperature']['min'],
-                      self.netatmo.outside['temperature']['max'])
-            w.refresh_forecast(self.wetter.minimumTemperature, self.wetter.maximumTemperature)
+            with profiler.phase('station.outside_temperature'):
+                w.refresh(self.netatmo.outside['temperature']['current'], self.netatmo.outside['temperature']['min'],
+                          self.netatmo.outside['temperature']['max'])
+                w.refresh_forecast(self.wetter.minimumTemperature, self.wetter.maximumTemperature)
 
             # Forecast data
             for d in range(1, 6):
                 forecast_day = now + datetime.timedelta(days=d)
                 forecast = get_forecast_for_day(forecast_day)
                 w = self.root.ids['day' + str(d)]
-                w.refresh(forecast_day, forecast['id'], forecast['temperature']['min'], forecast['temperature']['max'],
-                          forecast['rain'], forecast['snow'], forecast['clouds'])
+                with profiler.phase('station.day'):
+                    w.refresh(forecast_day, forecast['id'], forecast['temperature']['min'],
+                              forecast['temperature']['max'], forecast['rain'], forecast['snow'], forecast['clouds'])
 
             # Alarms
             # TODO: Take care of multiple alarms
             w = self.root.ids.alarms
-            if len(self.netatmo.alarm) > 0:
-                w.refresh(self.netatmo.alarm[0]['type'], self.netatmo.alarm[0]['level'],
-                          self.netatmo.alarm[0]['description'])
-            else:
-                self.root.ids.alarms.refresh(None, None, "");
+            with profiler.phase('station.alarms'):
+                if len(self.netatmo.alarm) > 0:
+                    w.refresh(self.netatmo.alarm[0]['type'], self.netatmo.alarm[0]['level'],
+                              self.netatmo.alarm[0]['description'])
+                else:
+                    self.root.ids.alarms.refresh(None, None, "");
 
             # Status
             w = self.root.ids.status
-            w.refresh({'battery': self.netatmo.outside['battery'], 'connection': self.netatmo.outside['connection']},
-                      {'battery': self.netatmo.rain['battery'], 'connection': self.netatmo.rain['connection']})
+            with profiler.phase('station.status'):
+                w.refresh({'battery': self.netatmo.outside['battery'], 'connection': self.netatmo.outside['connection']},
+                          {'battery': self.netatmo.rain['battery'], 'connection': self.netatmo.rain['connection']})
 
         except LookupError as lerr:
             Logger.warning(str(lerr))
@@ -102,6 +115,8 @@ class Station(App):
 
     def on_signal_hangup(self, signum, frame):
         Logger.debug('SIGHUP received')
+        if profiler.enabled:
+            Logger.info('Profiling:\n' + profiler.report())
 
 if __name__ == '__main__':
     station = Station()
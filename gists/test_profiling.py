@@ -0,0 +1,54 @@
+import tracemalloc
+
+from profiling import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.phase('idle'):
+        pass
+    assert profiler.summary() == {}
+
+
+def test_timing_only_does_not_trace():
+    profiler = Profiler()
+    profiler.enable()
+    with profiler.phase('owm.parse'):
+        pass
+    profiler.disable()
+    assert not tracemalloc.is_tracing()
+    assert profiler.summary()['owm.parse']['calls'] == 1
+    assert profiler.summary()['owm.parse']['allocations'] == 0
+
+
+def test_allocations_are_counted_and_never_negative():
+    profiler = Profiler()
+    profiler.enable(trace_allocations=True)
+    kept = None
+    with profiler.phase('allocate'):
+        kept = [object() for i in range(100)]
+    with profiler.phase('free'):
+        kept = None
+    profiler.disable()
+    summary = profiler.summary()
+    assert summary['allocate']['allocations'] >= 100
+    assert summary['free']['allocations'] >= 0
+
+
+def test_disable_keeps_tracing_started_elsewhere():
+    tracemalloc.start()
+    try:
+        profiler = Profiler()
+        profiler.enable(trace_allocations=True)
+        profiler.disable()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_disable_stops_tracing_it_started():
+    profiler = Profiler()
+    profiler.enable(trace_allocations=True)
+    assert tracemalloc.is_tracing()
+    profiler.disable()
+    assert not tracemalloc.is_tracing()
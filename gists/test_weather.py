@@ -0,0 +1,76 @@
+import json
+import os
+
+from array import array
+
+import pytest
+
+from integration import OpenWeatherMapIntegration, WetterComIntegration
+from weather import convert_owm_ids, convert_wettercom_ids, owm_frame_from_entries, to_conditions, ForecastFrame
+
+_payloads = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads')
+
+# Full code ranges, including ids outside the tables
+OWM_CODES = list(range(-100, 1100))
+WETTERCOM_CODES = list(range(-10, 200))
+
+
+def test_owm_table_matches_range_checks():
+    expected = [OpenWeatherMapIntegration._convert_weather_id(code) for code in OWM_CODES]
+    assert to_conditions(convert_owm_ids(OWM_CODES)) == expected
+
+
+def test_owm_table_matches_range_checks_per_code():
+    for code in OWM_CODES:
+        assert to_conditions(convert_owm_ids([code])) == [OpenWeatherMapIntegration._convert_weather_id(code)]
+
+
+def test_wettercom_table_matches_range_checks():
+    expected = [WetterComIntegration._convert_weather_id(code) for code in WETTERCOM_CODES]
+    assert to_conditions(convert_wettercom_ids(WETTERCOM_CODES)) == expected
+
+
+def test_wettercom_table_matches_range_checks_per_code():
+    for code in WETTERCOM_CODES:
+        assert to_conditions(convert_wettercom_ids([code])) == [WetterComIntegration._convert_weather_id(code)]
+
+
+def test_float_codes_match_range_checks():
+    expected = [OpenWeatherMapIntegration._convert_weather_id(float(code)) for code in OWM_CODES]
+    assert to_conditions(convert_owm_ids(array('d', OWM_CODES))) == expected
+    assert to_conditions(convert_owm_ids([float(code) for code in OWM_CODES])) == expected
+
+    expected = [WetterComIntegration._convert_weather_id(float(code)) for code in WETTERCOM_CODES]
+    assert to_conditions(convert_wettercom_ids(array('d', WETTERCOM_CODES))) == expected
+
+
+def test_fractional_codes_are_rejected():
+    with pytest.raises(ValueError):
+        convert_owm_ids([800.5])
+
+
+def test_empty_input():
+    assert len(convert_owm_ids([])) == 0
+    assert len(convert_wettercom_ids(iter([]))) == 0
+
+
+def test_frame_rows_match_owm_parser():
+    with open(os.path.join(_payloads, 'owm.json')) as payload:
+        data = json.load(payload)
+    frame = owm_frame_from_entries(data['list'])
+    forecast = OpenWeatherMapIntegration.parse(data)
+    assert len(frame) == len(forecast)
+    for index, entry in enumerate(forecast):
+        del entry['description'], entry['icon']
+        assert frame.row(index) == entry
+
+
+def test_frame_row_rounds_like_owm_parser():
+    row = ForecastFrame([0], [1], [12.35], [0.05], rain=[0.3]).row(0)
+    assert row['temperature'] == {'min': float(format(12.35, '.1f')), 'max': float(format(0.05, '.1f'))}
+    assert row['rain'] == 0.3
+
+
+def test_frame_rejects_column_of_wrong_length():
+    with pytest.raises(ValueError):
+        ForecastFrame([0, 1], [1, 1], [1.0], [2.0, 3.0])
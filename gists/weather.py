@@ -0,0 +1,186 @@
+import datetime
+import operator
+
+from array import array
+from enum import Enum, unique
+
+
+@unique
+class WeatherCondition(Enum):
+    clear = 1
+    cloudy = 2
+    drizzle = 3
+    rain = 4
+    heavy_rain = 5
+    hail = 6
+    snow = 7
+    heavy_snow = 8
+    fog = 9
+    wind = 10
+    thunderstorm = 11
+    tornado = 12
+
+
+# Lookup tables mapping provider weather ids to WeatherCondition values (0 = no condition). Rules are applied in the
+# same order as the range checks in OpenWeatherMapIntegration._convert_weather_id and
+# WetterComIntegration._convert_weather_id, the first matching rule wins.
+def _build_table(size, rules):
+    table = bytearray(size)
+    for codes, condition in rules:
+        for code in codes:
+            if table[code] == 0:
+                table[code] = condition.value
+    return bytes(table)
+
+
+_OWM_TABLE = _build_table(1000, [
+    (range(200, 300), WeatherCondition.thunderstorm),
+    (range(300, 400), WeatherCondition.drizzle),
+    ((500,), WeatherCondition.drizzle),
+    ((501,), WeatherCondition.rain),
+    (range(502, 600), WeatherCondition.heavy_rain),
+    (range(600, 602), WeatherCondition.snow),
+    (range(602, 700), WeatherCondition.heavy_snow),
+    (range(700, 781), WeatherCondition.fog),
+    ((781,), WeatherCondition.tornado),
+    ((800,), WeatherCondition.clear),
+    (range(801, 805), WeatherCondition.cloudy),
+    (range(900, 903), WeatherCondition.tornado),
+    ((905,), WeatherCondition.wind),
+    (range(957, 963), WeatherCondition.wind),
+    ((906,), WeatherCondition.hail),
+])
+
+_WETTERCOM_TABLE = _build_table(100, [
+    ((0,), WeatherCondition.clear),
+    ((1, 2, 3), WeatherCondition.cloudy),
+    (range(10, 40), WeatherCondition.cloudy),
+    ((4,), WeatherCondition.fog),
+    (range(40, 50), WeatherCondition.fog),
+    ((5, 50, 51, 53, 56), WeatherCondition.drizzle),
+    ((6, 8, 60, 61, 63), WeatherCondition.rain),
+    ((55, 65, 80, 81, 82), WeatherCondition.heavy_rain),
+    ((57, 66, 67, 69, 83, 84), WeatherCondition.hail),
+    ((7, 68, 70, 71, 73, 85), WeatherCondition.snow),
+    ((75, 86), WeatherCondition.heavy_snow),
+    ((9,), WeatherCondition.thunderstorm),
+    (range(90, 100), WeatherCondition.thunderstorm),
+])
+
+_CONDITIONS = [None] + [WeatherCondition(value) for value in range(1, len(WeatherCondition) + 1)]
+
+
+def _lookup(table, codes):
+    if not isinstance(codes, (list, tuple, array)):
+        codes = list(codes)
+    try:
+        return _lookup_ints(table, codes)
+    except TypeError:
+        pass
+    # Ids from bulk history may come as floats (e.g. array('d') or CSV columns), the tables are indexed by int
+    whole = array('q', map(int, codes))
+    if any(map(operator.ne, whole, codes)):
+        raise ValueError('Weather ids must be whole numbers')
+    return _lookup_ints(table, whole)
+
+
+def _lookup_ints(table, codes):
+    result = array('B')
+    if len(codes) == 0:
+        return result
+    if min(codes) >= 0 and max(codes) < len(table):
+        result.frombytes(bytes(map(table.__getitem__, codes)))
+    else:
+        size = len(table)
+        result.frombytes(bytes(table[code] if 0 <= code < size else 0 for code in codes))
+    return result
+
+
+# Converts a sequence of OWM weather ids to an array of WeatherCondition values (0 = None)
+def convert_owm_ids(codes):
+    return _lookup(_OWM_TABLE, codes)
+
+
+# Converts a sequence of wetter.com weather ids to an array of WeatherCondition values (0 = None)
+def convert_wettercom_ids(codes):
+    return _lookup(_WETTERCOM_TABLE, codes)
+
+
+# Converts an array of WeatherCondition values back to WeatherCondition members (or None)
+def to_conditions(values):
+    return list(map(_CONDITIONS.__getitem__, values))
+
+
+def _column(typecode, values, length, default=0):
+    if values is None:
+        return array(typecode, [default]) * length
+    column = array(typecode, values)
+    if len(column) != length:
+        raise ValueError('Column length {} does not match {} rows'.format(len(column), length))
+    return column
+
+
+# Compact columnar forecast, one array per field. Times are POSIX timestamps, conditions WeatherCondition values.
+class ForecastFrame:
+
+    def __init__(self, time, condition, temperature_min, temperature_max, pressure=None, humidity=None,
+                 clouds=None, snow=None, rain=None):
+        self.time = array('d', time)
+        length = len(self.time)
+        self.condition = _column('B', condition, length)
+        self.temperature_min = _column('d', temperature_min, length)
+        self.temperature_max = _column('d', temperature_max, length)
+        self.pressure = _column('d', pressure, length)
+        self.humidity = _column('B', humidity, length)
+        self.clouds = _column('B', clouds, length)
+        self.snow = _column('d', snow, length)
+        self.rain = _column('d', rain, length)
+
+    def __len__(self):
+        return len(self.time)
+
+    def conditions(self):
+        return to_conditions(self.condition)
+
+    # Single row in the shape of an OpenWeatherMapIntegration.forecast entry, without description and icon
+    def row(self, index):
+        return {
+            'time': datetime.datetime.fromtimestamp(self.time[index]),
+            'id': _CONDITIONS[self.condition[index]],
+            'temperature': {
+                'min': float(format(self.temperature_min[index], '.1f')),
+                'max': float(format(self.temperature_max[index], '.1f'))
+            },
+            'pressure': self.pressure[index],
+            'humidity': self.humidity[index],
+            'clouds': self.clouds[index],
+            'snow': self.snow[index],
+            'rain': self.rain[index]
+        }
+
+
+def owm_frame(time, weather_id, temperature_min, temperature_max, pressure=None, humidity=None, clouds=None,
+              snow=None, rain=None):
+    return ForecastFrame(time, convert_owm_ids(weather_id), temperature_min, temperature_max, pressure, humidity,
+                         clouds, snow, rain)
+
+
+def wettercom_frame(time, weather_id, temperature_min, temperature_max):
+    return ForecastFrame(time, convert_wettercom_ids(weather_id), temperature_min, temperature_max)
+
+
+# Builds a frame from the 'list' entries of OWM daily forecast responses
+def owm_frame_from_entries(entries):
+    if not isinstance(entries, (list, tuple)):
+        entries = list(entries)
+    return owm_frame(
+        [entry['dt'] for entry in entries],
+        [entry['weather'][0]['id'] for entry in entries],
+        [entry['temp']['min'] for entry in entries],
+        [entry['temp']['max'] for entry in entries],
+        [entry['pressure'] for entry in entries],
+        [entry['humidity'] for entry in entries],
+        [entry['clouds'] if 'clouds' in entry else 0 for entry in entries],
+        [entry['snow'] if 'snow' in entry else 0 for entry in entries],
+        [entry['rain'] if 'rain' in entry else 0 for entry in entries])
+
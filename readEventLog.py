@@ -0,0 +1,101 @@
+import argparse
+import mmap
+import os
+import sys
+
+from datetime import datetime
+from EventLog import *
+
+
+def logFiles(path, withBackups):
+    files = []
+    if withBackups:
+        i = 1
+        while os.path.exists('{}.{}'.format(path, i)):
+            files.append('{}.{}'.format(path, i))
+            i += 1
+        files.reverse()  # oldest first
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def readEvents(path, eventTypes=None, sprinklerId=None, since=None, until=None):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        size -= size % RECORD_SIZE  # ignore a partially written record
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            view = memoryview(m)[:size]
+            try:
+                for record in RECORD.iter_unpack(view):
+                    timestamp, eventType, sprinkler = record[0], record[1], record[2]
+                    if eventTypes is not None and eventType not in eventTypes:
+                        continue
+                    if sprinklerId is not None and sprinkler != sprinklerId:
+                        continue
+                    if since is not None and timestamp < since:
+                        continue
+                    if until is not None and timestamp > until:
+                        continue
+                    yield record
+            finally:
+                view.release()
+
+
+def formatEvent(record):
+    timestamp, eventType, sprinkler, a, b, c = record
+    line = '{} {:<20}'.format(datetime.fromtimestamp(timestamp).strftime('%Y-%m-%dT%H:%M:%S'),
+                              EVENT_NAMES.get(eventType, str(eventType)))
+    if sprinkler >= 0:
+        line += ' sprinkler={}'.format(sprinkler)
+    if eventType == SCHEDULE_REGISTERED:
+        line += ' {:02d}:{:02d}-{:02d}:{:02d} P{}D'.format(a // 60, a % 60, b // 60, b % 60, c)
+    elif eventType in (SPRINKLER_SETUP, VALVE_OPEN, VALVE_CLOSE):
+        line += ' gpio={}'.format(a)
+    elif eventType == SCHEDULES_READ:
+        line += ' count={}'.format(a)
+    elif eventType == ERROR:
+        line += ' class={} line={}'.format(ERROR_NAMES.get(a, str(a)), b)
+    elif eventType == SHUTDOWN:
+        line += ' reason={}'.format({SHUTDOWN_KEYBOARD: 'keyboard', SHUTDOWN_ERROR: 'error'}.get(a, str(a)))
+    elif a or b or c:
+        line += ' {} {} {}'.format(a, b, c)
+    return line
+
+
+def parseTime(value):
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S').timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Filter and replay the binary garden event log')
+    parser.add_argument('path', nargs='?', default='garden-events.log')
+    parser.add_argument('--all', action='store_true', help='include rotated log files')
+    parser.add_argument('--type', action='append', choices=sorted(EVENT_NAMES.values()), help='event type filter')
+    parser.add_argument('--sprinkler', type=int, help='sprinkler id filter')
+    parser.add_argument('--since', type=parseTime, help='YYYY-MM-DDTHH:MM:SS')
+    parser.add_argument('--until', type=parseTime, help='YYYY-MM-DDTHH:MM:SS')
+    parser.add_argument('--count', action='store_true', help='only print the number of matching events')
+    args = parser.parse_args()
+
+    eventTypes = None
+    if args.type:
+        eventTypes = {eventType for eventType, name in EVENT_NAMES.items() if name in args.type}
+
+    count = 0
+    for path in logFiles(args.path, args.all):
+        for record in readEvents(path, eventTypes, args.sprinkler, args.since, args.until):
+            count += 1
+            if not args.count:
+                print(formatEvent(record))
+    if args.count:
+        print(count)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except BrokenPipeError:
+        sys.exit()
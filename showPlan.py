@@ -0,0 +1,67 @@
+import argparse
+import datetime
+import json
+
+import EventLog
+
+from IrrigationPlan import *
+from readEventLog import logFiles, readEvents
+
+
+# Reads time and rain of a raw OpenWeatherMap daily forecast response. The weather condition is left out, as
+# converting the OWM id needs the Kivy based integrations; plan runs from this forecast have no condition
+def readForecast(path):
+    with open(path) as json_data:
+        response = json.load(json_data)
+    return [{
+        'time': datetime.datetime.fromtimestamp(entry['dt']),
+        'rain': entry['rain'] if 'rain' in entry else 0
+    } for entry in response['list']]
+
+
+# Time of the last schedule registration by daemon.py, taken from its event log
+def readAnchor(path):
+    anchor = None
+    for logFile in logFiles(path, True):
+        for record in readEvents(logFile, {EventLog.SCHEDULES_READ}):
+            anchor = record[0]
+    return datetime.datetime.fromtimestamp(anchor) if anchor is not None else None
+
+
+def printUpdate(update):
+    print('{} recomputed {} zones / {} days in {:.3f} ms'.format(
+        update['kind'], update['zones'], update['days'], update['seconds'] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the seven-day irrigation plan')
+    parser.add_argument('--config', default='garden-config.json')
+    parser.add_argument('--forecast', help='OpenWeatherMap daily forecast response (json)')
+    parser.add_argument('--events', default='garden-events.log', help='event log of daemon.py')
+    parser.add_argument('--anchor', type=lambda value: datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S'),
+                        help='time daemon.py registered the schedules (YYYY-MM-DDTHH:MM:SS), '
+                             'default is taken from the event log')
+    args = parser.parse_args()
+
+    with open(args.config) as json_data:
+        config = json.load(json_data)
+
+    anchor = args.anchor if args.anchor is not None else readAnchor(args.events)
+    if anchor is None:
+        print('No schedule registration found in {}, runs are only correct for daily schedules'.format(args.events))
+    else:
+        print('Schedules registered at {}'.format(anchor.strftime('%Y-%m-%dT%H:%M:%S')))
+
+    plan = IrrigationPlan(config, anchor)
+    printUpdate(plan.build())
+    if args.forecast:
+        printUpdate(plan.updateForecast(readForecast(args.forecast)))
+
+    for run in plan.plan():
+        print('{} {}-{} {:<2} {:<24} {}'.format(
+            run['date'].strftime('%a %Y-%m-%d'), run['startTime'], run['endTime'], run['sprinklerId'], run['name'],
+            'skip ({} mm rain)'.format(run['rain']) if run['skip'] else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import datetime
+
+from IrrigationPlan import IrrigationPlan
+
+TODAY = datetime.date(2026, 10, 19)
+
+
+def config(*schedules):
+    return {
+        'sprinklers': [
+            {'id': 0, 'name': 'Vorgarten', 'gpio': 14},
+            {'id': 1, 'name': 'Rueckgarten', 'gpio': 15}
+        ],
+        'schedules': list(schedules)
+    }
+
+
+def schedule(sprinklerId, startTime, recurrenceInDays):
+    return {'sprinklerId': sprinklerId, 'startTime': startTime, 'endTime': startTime, 'recurrenceInDays': recurrenceInDays}
+
+
+def runDays(plan, sprinklerId=None):
+    return [run['date'].day for run in plan.plan() if sprinklerId is None or run['sprinklerId'] == sprinklerId]
+
+
+def forecast(rainByDay):
+    return [{'time': datetime.datetime(2026, 10, day, 12), 'rain': rain, 'id': None}
+            for day, rain in sorted(rainByDay.items())]
+
+
+def test_daily_schedule_registered_before_start_time_runs_today():
+    plan = IrrigationPlan(config(schedule(0, '06:00', 1)), datetime.datetime(2026, 10, 19, 5, 0))
+    plan.build(TODAY)
+    assert runDays(plan) == [19, 20, 21, 22, 23, 24, 25]
+
+
+def test_daily_schedule_registered_after_start_time_runs_tomorrow():
+    plan = IrrigationPlan(config(schedule(0, '06:00', 1)), datetime.datetime(2026, 10, 19, 7, 0))
+    plan.build(TODAY)
+    assert runDays(plan) == [20, 21, 22, 23, 24, 25]
+
+
+def test_recurrence_counts_from_registration():
+    # the schedule library does not run an every(n > 1) job on the day of registration, even before its time
+    plan = IrrigationPlan(config(schedule(0, '06:00', 3)), datetime.datetime(2026, 10, 19, 5, 0))
+    plan.build(TODAY)
+    assert runDays(plan) == [22, 25]
+
+    plan = IrrigationPlan(config(schedule(0, '06:00', 3)), datetime.datetime(2026, 10, 17, 7, 0))
+    plan.build(TODAY)
+    assert runDays(plan) == [20, 23]
+
+
+def test_forecast_change_on_day_without_runs_touches_no_zone():
+    plan = IrrigationPlan(config(schedule(0, '06:00', 3), schedule(1, '07:00', 3)),
+                          datetime.datetime(2026, 10, 19, 5, 0))
+    plan.build(TODAY)
+    update = plan.updateForecast(forecast({20: 10}))
+    assert update['zones'] == 0
+    assert update['days'] == 0
+
+
+def test_forecast_change_on_run_day_touches_watering_zones():
+    plan = IrrigationPlan(config(schedule(0, '06:00', 3), schedule(1, '07:00', 2)),
+                          datetime.datetime(2026, 10, 19, 5, 0))
+    plan.build(TODAY)
+    update = plan.updateForecast(forecast({22: 10}))
+    assert update['zones'] == 1
+    assert update['days'] == 1
+    assert [run['skip'] for run in plan.plan() if run['date'].day == 22] == [True]
+
+    # unchanged forecast recomputes nothing
+    assert plan.updateForecast(forecast({22: 10}))['zones'] == 0
+
+
+def test_advance_computes_only_days_entering_window():
+    plan = IrrigationPlan(config(schedule(0, '06:00', 1), schedule(1, '07:00', 2)),
+                          datetime.datetime(2026, 10, 19, 5, 0))
+    plan.build(TODAY)
+    update = plan.advance(TODAY + datetime.timedelta(days=2))
+    assert update['days'] == 2
+    assert update['zones'] == 2
+
+    rebuilt = IrrigationPlan(config(schedule(0, '06:00', 1), schedule(1, '07:00', 2)),
+                             datetime.datetime(2026, 10, 19, 5, 0))
+    rebuilt.build(TODAY + datetime.timedelta(days=2))
+    assert plan.plan() == rebuilt.plan()
+
+
+def test_advance_uses_forecast_received_beyond_window():
+    plan = IrrigationPlan(config(schedule(0, '06:00', 1)), datetime.datetime(2026, 10, 19, 5, 0))
+    plan.build(TODAY)
+    plan.updateForecast(forecast({day: 10 for day in range(19, 29)}))
+    plan.advance(TODAY + datetime.timedelta(days=2))
+    assert [run['rain'] for run in plan.plan()] == [10] * 7
+
+
+def test_updates_before_build_build_the_plan():
+    plan = IrrigationPlan(config(schedule(0, '06:00', 1)), datetime.datetime.now())
+    assert plan.updateSchedule(None, schedule(1, '07:00', 1))['zones'] == 1
+    assert plan.today == datetime.date.today()